@@ -56,14 +56,17 @@
 // 2MM
 //
 // Multiply two matrixes with this result multiply with another matrix and
-// output the result as a csv like structure (without the header).
+// output the result as a csv like structure (without the header), or as a
+// binary NumPy array when the output file ends with ".npy".
 //
-// Usage: ./2mm <matrix_size>
+// Usage: ./2mm <matrix_size> <output_file>
 //
 //===----------------------------------------------------------------------===//
 
+#include <cstdint>
 #include <fstream>
 #include <iostream>
+#include <string>
 #include <unistd.h>
 
 //===------------------------------------------------------------------------===
@@ -78,6 +81,30 @@ void output_matrix(double *&matrix, size_t size, std::ostream &os) {
   }
 }
 
+bool is_npy(const std::string &path) {
+  return path.size() >= 4 && path.compare(path.size() - 4, 4, ".npy") == 0;
+}
+
+// Writes the matrix as a NumPy .npy file (format 1.0): a header with the
+// dtype and shape, padded to 64 bytes, followed by the raw row-major data.
+void output_matrix_npy(double *&matrix, size_t rows, size_t columns,
+                       std::ostream &os) {
+  std::string header = "{'descr': '<f8', 'fortran_order': False, 'shape': (" +
+                       std::to_string(rows) + ", " + std::to_string(columns) +
+                       "), }";
+  size_t unpadded = 10 + header.size() + 1;
+  header.append((64 - unpadded % 64) % 64, ' ');
+  header += '\n';
+
+  uint16_t length = header.size();
+  os.write("\x93NUMPY\x01\x00", 8);
+  os.put(length & 0xff);
+  os.put(length >> 8);
+  os.write(header.data(), header.size());
+  os.write(reinterpret_cast<const char *>(matrix),
+           rows * columns * sizeof(double));
+}
+
 void init_matrix(double *&matrix, size_t size, bool fill = false) {
   matrix = new double[size * size]();
 
@@ -146,7 +173,7 @@ int main(int argc, char **argv) {
   }
 
   size_t matrixSize = atol(argv[1]);
-  std::ofstream ofs(argv[2]);
+  std::ofstream ofs(argv[2], std::ios::out | std::ios::binary);
   if (!ofs) {
     std::cerr << "Failed to open output file: " << argv[2] << '\n';
     return -1;
@@ -167,7 +194,11 @@ int main(int argc, char **argv) {
   matmul(A, B, C, matrixSize);
   matmul(C, D, E, matrixSize);
 
-  output_matrix(E, matrixSize, ofs);
+  if (is_npy(argv[2])) {
+    output_matrix_npy(E, matrixSize, matrixSize, ofs);
+  } else {
+    output_matrix(E, matrixSize, ofs);
+  }
 
   delete[] A;
   delete[] B;
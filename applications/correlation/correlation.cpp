@@ -70,11 +70,15 @@
 // - sumY2 = Sum of all the values of column Y squared;
 // - n     = The number of elements in both columns
 //
-// Usage: ./correlation <csv_file>
+// The correlation matrix is written as a csv, or as a binary NumPy array when
+// the output file ends with ".npy".
+//
+// Usage: ./correlation <csv_file> <output_file>
 //
 //===----------------------------------------------------------------------===//
 
 #include <cmath>
+#include <cstdint>
 #include <fstream>
 #include <iomanip>
 #include <iostream>
@@ -204,6 +208,29 @@ void save_matrix_to_file(double *matrix, int columns, std::ofstream &file) {
   }
 }
 
+bool is_npy(const std::string &path) {
+  return path.size() >= 4 && path.compare(path.size() - 4, 4, ".npy") == 0;
+}
+
+// Writes the matrix as a NumPy .npy file (format 1.0): a header with the
+// dtype and shape, padded to 64 bytes, followed by the raw row-major data.
+void save_matrix_to_npy(double *matrix, int columns, std::ofstream &file) {
+  std::string header = "{'descr': '<f8', 'fortran_order': False, 'shape': (" +
+                       std::to_string(columns) + ", " +
+                       std::to_string(columns) + "), }";
+  size_t unpadded = 10 + header.size() + 1;
+  header.append((64 - unpadded % 64) % 64, ' ');
+  header += '\n';
+
+  uint16_t length = header.size();
+  file.write("\x93NUMPY\x01\x00", 8);
+  file.put(length & 0xff);
+  file.put(length >> 8);
+  file.write(header.data(), header.size());
+  file.write(reinterpret_cast<const char *>(matrix),
+             static_cast<size_t>(columns) * columns * sizeof(double));
+}
+
 //===------------------------------------------------------------------------===
 // Main
 //===------------------------------------------------------------------------===
@@ -221,7 +248,7 @@ int main(int argc, char **argv) {
     return -1;
   }
 
-  std::ofstream outfile(argv[2]);
+  std::ofstream outfile(argv[2], std::ios::out | std::ios::binary);
   if (!file) {
     std::cerr << "Could not open file " << argv[2] << "\n";
     return -1;
@@ -231,7 +258,11 @@ int main(int argc, char **argv) {
   double **data = readData(file, columns, rows);
 
   double *matrix = correlationMatrix(data, columns, rows);
-  save_matrix_to_file(matrix, columns, outfile);
+  if (is_npy(argv[2])) {
+    save_matrix_to_npy(matrix, columns, outfile);
+  } else {
+    save_matrix_to_file(matrix, columns, outfile);
+  }
 
   for (int i = 0; i < columns; i++) {
     delete[] data[i];
@@ -59,14 +59,17 @@
 // Iteratively updates each cell in the grid to the average of its four
 // neighbors. Used for solving partial differential equations such as Laplace's
 // equation.
-// Outputs the final 2D grid as a CSV format (without header).
+// Outputs the final 2D grid as a CSV format (without header), or as a binary
+// NumPy array when the output file ends with ".npy".
 //
-// Usage: ./jacobi2d <matrix_size> <number_steps>
+// Usage: ./jacobi2d <matrix_size> <number_steps> <output_file>
 //
 //===----------------------------------------------------------------------===//
 
+#include <cstdint>
 #include <fstream>
 #include <iostream>
+#include <string>
 #include <unistd.h>
 
 //===------------------------------------------------------------------------===
@@ -81,6 +84,30 @@ void output_matrix(double *&matrix, size_t size, std::ostream &os) {
   }
 }
 
+bool is_npy(const std::string &path) {
+  return path.size() >= 4 && path.compare(path.size() - 4, 4, ".npy") == 0;
+}
+
+// Writes the matrix as a NumPy .npy file (format 1.0): a header with the
+// dtype and shape, padded to 64 bytes, followed by the raw row-major data.
+void output_matrix_npy(double *&matrix, size_t rows, size_t columns,
+                       std::ostream &os) {
+  std::string header = "{'descr': '<f8', 'fortran_order': False, 'shape': (" +
+                       std::to_string(rows) + ", " + std::to_string(columns) +
+                       "), }";
+  size_t unpadded = 10 + header.size() + 1;
+  header.append((64 - unpadded % 64) % 64, ' ');
+  header += '\n';
+
+  uint16_t length = header.size();
+  os.write("\x93NUMPY\x01\x00", 8);
+  os.put(length & 0xff);
+  os.put(length >> 8);
+  os.write(header.data(), header.size());
+  os.write(reinterpret_cast<const char *>(matrix),
+           rows * columns * sizeof(double));
+}
+
 double *init_matrix(size_t size, int offset) {
   double *matrix = new double[size * size];
 
@@ -161,7 +188,7 @@ int main(int argc, char **argv) {
 
   size_t size = atoi(argv[1]);
   int steps = atoi(argv[2]);
-  std::ofstream outfile(argv[3]);
+  std::ofstream outfile(argv[3], std::ios::out | std::ios::binary);
   if (!outfile) {
     std::cerr << "Failed to open output file: " << argv[3] << '\n';
     return -1;
@@ -171,7 +198,11 @@ int main(int argc, char **argv) {
   double *B = init_matrix(size, 3);
 
   jacobi2d(steps, size, A, B);
-  output_matrix(A, size, outfile);
+  if (is_npy(argv[3])) {
+    output_matrix_npy(A, size, size, outfile);
+  } else {
+    output_matrix(A, size, outfile);
+  }
 
   delete[] A;
   delete[] B;
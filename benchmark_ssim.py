@@ -0,0 +1,52 @@
+import sys
+import time
+import numpy as np
+from skimage.metrics import structural_similarity as similarity
+from run import ssim_tiled
+
+IMAGE_SIZES = [1024, 2048, 4096, 8192]
+REPETITIONS = 3
+
+# ============================================================
+# Helpers
+# ============================================================
+
+
+def make_images(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    ref = rng.integers(0, 256, (size, size), dtype=np.uint8)
+    noise = rng.integers(-16, 17, (size, size))
+    pred = np.clip(ref.astype(np.int64) + noise, 0, 255).astype(np.uint8)
+    return ref, pred
+
+
+def best_time(func, *args):
+    best = float("inf")
+    value = None
+    for _ in range(REPETITIONS):
+        start = time.perf_counter()
+        value = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+# ============================================================
+# Execution
+# ============================================================
+
+
+def run(sizes):
+    print("size,full_frame_s,tiled_s,speedup,abs_diff")
+    for size in sizes:
+        ref, pred = make_images(size)
+        full_time, full_val = best_time(similarity, ref, pred)
+        tiled_time, tiled_val = best_time(ssim_tiled, ref, pred)
+        print(
+            f"{size},{full_time:.4f},{tiled_time:.4f},"
+            f"{full_time / tiled_time:.2f},{abs(full_val - tiled_val):.3e}"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(s) for s in sys.argv[1:]] or IMAGE_SIZES
+    run(sizes)
@@ -0,0 +1,72 @@
+import ctypes
+import mmap
+import os
+import sys
+import tempfile
+from run import ensure_inputs_resident, input_residency, libc, stage_input
+
+FILE_SIZE = 64 * 1024 * 1024
+
+# ============================================================
+# Helpers
+# ============================================================
+
+
+def mapping_smaps(address: int) -> dict:
+    """Returns the smaps counters (in kB) of the mapping starting at address."""
+    fields = {}
+    found = False
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            head = line.split()[0]
+            if "-" in head and not head.endswith(":"):
+                found = int(head.split("-")[0], 16) == address
+            elif found and line.split()[-1] == "kB":
+                fields[head.rstrip(":")] = int(line.split()[1])
+    return fields
+
+
+def evict(staged: dict):
+    """Unlocks the staged input and drops it from the page cache."""
+    length = len(staged["map"])
+    libc.munlock(ctypes.c_void_p(staged["address"]), ctypes.c_size_t(length))
+    staged["map"].madvise(mmap.MADV_DONTNEED)
+    with open(staged["path"], "rb") as f:
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+# ============================================================
+# Execution
+# ============================================================
+
+
+def run(path: str):
+    staged = stage_input(path)
+    smaps = mapping_smaps(staged["address"])
+    print(
+        f"staged: residency={input_residency(staged):.3f} "
+        f"anonymous={smaps.get('Anonymous')} kB locked={smaps.get('Locked')} kB"
+    )
+    assert smaps.get("Anonymous", 0) == 0, "input was copied into anonymous memory"
+    assert ensure_inputs_resident([staged]) == "warm"
+
+    evict(staged)
+    residency = input_residency(staged)
+    print(f"evicted: residency={residency:.3f}")
+    assert residency < 1.0, "eviction did not drop any page"
+
+    state = ensure_inputs_resident([staged])
+    print(f"before run: state={state} residency={input_residency(staged):.3f}")
+    assert state in ("refaulted", "cold")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+    else:
+        with tempfile.NamedTemporaryFile(dir=".") as f:
+            f.write(os.urandom(FILE_SIZE))
+            f.flush()
+            os.fsync(f.fileno())
+            run(f.name)
+    print("[INFO] Input staging checks passed")
@@ -1,6 +1,7 @@
 import duckdb
 import sys
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
 PERFORMANCE_METRIC = "elapsed"
@@ -14,7 +15,7 @@ def get_approx_apps(conn):
     return conn.execute("""
         SELECT bench_name, MAX(bench_version) AS bench_version
         FROM ExecutionGroup
-        WHERE approx_type IS NOT NULL
+        WHERE approx_type IS NOT NULL AND scaling IS NULL
         GROUP BY bench_name;
     """).df()
 
@@ -25,6 +26,7 @@ def get_approx_types(conn, app_name: str, app_version: int):
         SELECT approx_type
         FROM ExecutionGroup
         WHERE bench_name = ? AND bench_version = ? AND approx_type IS NOT NULL
+          AND scaling IS NULL
         GROUP BY approx_type;
     """,
         (app_name, app_version),
@@ -37,6 +39,7 @@ def get_approx_rates(conn, app_name: str, app_version: int, approx_type: str):
         SELECT approx_rate
         FROM ExecutionGroup
         WHERE bench_name = ? AND bench_version = ? AND approx_type = ?
+          AND scaling IS NULL
         GROUP BY approx_rate;
     """,
         (app_name, app_version, approx_type),
@@ -56,6 +59,7 @@ def get_num_threads(
         WHERE bench_name = ? 
           AND bench_version = ? 
           AND approx_type = ?
+          AND scaling IS NULL
     """
 
     params = [app_name, app_version, approx_type]
@@ -76,7 +80,9 @@ def get_approx_execution_group_id(
     approx_type: str,
     num_threads: int,
     approx_rate: int | None = None,
+    timed: bool = False,
 ):
+    """Latest matching group; with timed, only among timed groups."""
     sql = """
         SELECT id
         FROM ExecutionGroup
@@ -84,14 +90,18 @@ def get_approx_execution_group_id(
           AND bench_version = ? 
           AND approx_type = ? 
           AND num_threads = ?
+          AND scaling IS NULL
     """
 
     params = [app_name, app_version, approx_type, num_threads]
     if approx_rate is None:
-        sql += " AND approx_rate IS NULL;"
+        sql += " AND approx_rate IS NULL"
     else:
-        sql += " AND approx_rate = ?;"
+        sql += " AND approx_rate = ?"
         params.append(approx_rate)
+    if timed:
+        sql += " AND timed"
+    sql += " ORDER BY id DESC LIMIT 1;"
 
     df = conn.execute(sql, params).df()
 
@@ -113,7 +123,11 @@ def get_omp_execution_group_id(
         WHERE bench_name = ? 
           AND bench_version = ? 
           AND type = 'omp'
-          AND num_threads = ?;
+          AND num_threads = ?
+          AND scaling IS NULL
+          AND timed
+        ORDER BY id DESC
+        LIMIT 1;
         """
 
     params = [app_name, app_version, num_threads]
@@ -136,7 +150,11 @@ def get_base_execution_group_id(
         WHERE bench_name = ? 
           AND bench_version = ? 
           AND type = 'omp'
-          AND num_threads = 1;
+          AND num_threads = 1
+          AND scaling IS NULL
+          AND timed
+        ORDER BY id DESC
+        LIMIT 1;
     """
     params = [app_name, app_version]
     df = conn.execute(sql, params).df()
@@ -169,15 +187,89 @@ def get_performance_value(
 ):
     return conn.execute(
         """
-        SELECT group_id, MEAN(value) AS value
-        FROM Performance
-        WHERE group_id = ? AND name = ?
-        GROUP BY group_id;
+        SELECT p.group_id, MEAN(p.value) AS value
+        FROM Performance p
+        JOIN ExecutionGroup g ON g.id = p.group_id
+        WHERE p.group_id = ? AND p.name = ? AND g.timed
+        GROUP BY p.group_id;
     """,
         (group_id, value_name),
     ).df()
 
 
+def get_orchestrator_phases(conn):
+    return conn.execute("""
+        SELECT g.bench_name, p.phase, SUM(p.duration) AS duration
+        FROM OrchestratorPhase p
+        JOIN ExecutionGroup g ON g.id = p.group_id
+        GROUP BY g.bench_name, p.phase;
+    """).df()
+
+
+def get_profiled_approx_groups(conn):
+    return conn.execute("""
+        SELECT DISTINCT g.id, g.bench_name, g.bench_version, g.approx_type,
+               g.approx_rate, g.num_threads
+        FROM ExecutionGroup g
+        JOIN ProfileHotspot p ON p.group_id = g.id
+        WHERE g.approx_type IS NOT NULL AND g.scaling IS NULL
+        ORDER BY g.bench_name, g.approx_type, g.approx_rate, g.num_threads;
+    """).df()
+
+
+def get_hotspots(conn, group_id: int, kind: str):
+    return conn.execute(
+        """
+        SELECT name, percent
+        FROM ProfileHotspot
+        WHERE group_id = ? AND kind = ?;
+        """,
+        (group_id, kind),
+    ).df()
+
+
+def get_scaling_values(conn, value_name: str):
+    return conn.execute(
+        """
+        SELECT g.bench_name, g.bench_version, g.type, g.approx_type,
+               g.approx_rate, g.num_threads,
+               COALESCE(g.scaling, 'strong') AS scaling,
+               COALESCE(g.work_scale, 1.0) AS work_scale,
+               CAST(i.input AS VARCHAR) AS input,
+               MEAN(p.value) AS value
+        FROM ExecutionGroup g
+        JOIN ExecutionInput i ON i.group_id = g.id
+        JOIN Performance p ON p.group_id = g.id
+        WHERE p.name = ? AND g.timed
+        GROUP BY ALL;
+        """,
+        (value_name,),
+    ).df()
+
+
+# ============================================================
+# Scaling models
+# ============================================================
+
+
+def fit_amdahl(threads: np.ndarray, speedup: np.ndarray) -> float:
+    """Least-squares serial fraction s of S(t) = 1 / (s + (1 - s) / t)."""
+    x = 1.0 - 1.0 / threads
+    y = 1.0 / speedup - 1.0 / threads
+    if np.sum(x * x) == 0:
+        return np.nan
+    return float(np.sum(x * y) / np.sum(x * x))
+
+
+def fit_gustafson(threads: np.ndarray, speedup: np.ndarray) -> float:
+    """Least-squares serial fraction s of S(t) = t - s * (t - 1)."""
+    x = threads - 1.0
+    y = threads - speedup
+    if np.sum(x * x) == 0:
+        return np.nan
+    return float(np.sum(x * y) / np.sum(x * x))
+
+
 # ============================================================
 # Graphs
 # ============================================================
@@ -337,11 +429,21 @@ def run(conn):
                     metric["threads"] = num_thread.num_threads
                     quality_metrics.append(metric)
 
+                    group_id = get_approx_execution_group_id(
+                        conn,
+                        app.bench_name,
+                        app.bench_version,
+                        type.approx_type,
+                        num_thread.num_threads,
+                        approx_rate,
+                        timed=True,
+                    )
                     perf_approx = get_performance_value(
                         conn, group_id, PERFORMANCE_METRIC
                     )
                     perf_approx["threads"] = num_thread.num_threads
-                    performance_approx.append(perf_approx)
+                    if not perf_approx.empty:
+                        performance_approx.append(perf_approx)
 
                     group_id = get_omp_execution_group_id(
                         conn,
@@ -353,7 +455,8 @@ def run(conn):
                         conn, group_id, PERFORMANCE_METRIC
                     )
                     perf_omp["threads"] = num_thread.num_threads
-                    performance_omp.append(perf_omp)
+                    if not perf_omp.empty:
+                        performance_omp.append(perf_omp)
 
                 plot_quality_metrics(
                     app.bench_name,
@@ -380,8 +483,127 @@ def run(conn):
                 )
 
 
+def diff_hotspots(omp: pd.DataFrame, approx: pd.DataFrame) -> pd.DataFrame:
+    df = omp.merge(approx, on="name", how="outer", suffixes=("_omp", "_approx"))
+    df = df.fillna(0.0)
+    df["delta"] = df["percent_approx"] - df["percent_omp"]
+    return df.loc[df["delta"].abs().sort_values(ascending=False).index]
+
+
+def profiles_summary(conn, kind: str = "symbol"):
+    """Prints how the hotspots of each profiled approx group moved vs omp."""
+    groups = get_profiled_approx_groups(conn)
+    if groups.empty:
+        print("[WARN] No profiled approximate groups")
+        return
+
+    for g in groups.itertuples(index=False):
+        omp_id = get_omp_execution_group_id(
+            conn, g.bench_name, g.bench_version, g.num_threads
+        )
+        omp = get_hotspots(conn, omp_id, kind) if omp_id is not None else None
+        if omp is None or omp.empty:
+            print(
+                f"[WARN] Missing omp profile. "
+                f"App={g.bench_name}, Threads={g.num_threads}"
+            )
+            continue
+
+        title = f"{g.bench_name.upper()} {g.approx_type}"
+        if not pd.isna(g.approx_rate):
+            title += f" {int(g.approx_rate)}"
+        print(f"\n{title} - {g.num_threads} threads vs omp")
+        diff = diff_hotspots(omp, get_hotspots(conn, g.id, kind))
+        print(diff.round(2).to_string(index=False))
+
+
+def scaling_summary(conn):
+    """Fits each variant against its own 1-thread time; Gustafson for weak."""
+    df = get_scaling_values(conn, PERFORMANCE_METRIC)
+    df = df[df["type"] != "common"]
+    if df.empty:
+        print("[WARN] No performance data to fit")
+        return
+
+    # Weak-scaling inputs grow with the threads, so the sweep has no single input
+    df.loc[df["scaling"] == "weak", "input"] = "weak"
+    df["variant"] = df["approx_type"].fillna(df["type"])
+    rates = df["approx_rate"].dropna().astype(int).astype(str)
+    df.loc[rates.index, "variant"] += " " + rates
+
+    rows = []
+    keys = ["bench_name", "bench_version", "scaling", "input"]
+    for (name, version, scaling, input), study in df.groupby(keys):
+        base = study[(study["type"] == "omp") & (study["num_threads"] == 1)]
+        if base.empty:
+            print(f"[WARN] Missing 1-thread omp run. App={name}, Input={input}")
+            continue
+        base_val = base["value"].iloc[0]
+
+        for variant, g in study.groupby("variant"):
+            g = g.sort_values("num_threads")
+            if g["num_threads"].iloc[0] != 1:
+                print(
+                    f"[WARN] Missing 1-thread run. App={name}, Variant={variant}, "
+                    f"Input={input}"
+                )
+                continue
+
+            threads = g["num_threads"].to_numpy(dtype=np.float64)
+            values = g["value"].to_numpy(dtype=np.float64)
+            speedup = values[0] / values
+            if scaling == "weak":
+                speedup *= g["work_scale"].to_numpy(dtype=np.float64)
+                model, fit = "gustafson", fit_gustafson
+            else:
+                model, fit = "amdahl", fit_amdahl
+
+            row = {
+                "bench_name": name,
+                "bench_version": version,
+                "input": input,
+                "variant": variant,
+                "model": model,
+                "serial_fraction": fit(threads, speedup),
+                "factor_vs_omp": base_val / values[0],
+            }
+            for t, s in zip(g["num_threads"], speedup):
+                row[f"E@{t}"] = s / t
+            rows.append(row)
+
+    print(pd.DataFrame(rows).round(3).to_string(index=False))
+
+
+def phases_summary(conn):
+    """Prints the time run.py spent in each phase, per benchmark."""
+    df = get_orchestrator_phases(conn)
+    if df.empty:
+        print("[WARN] No orchestrator phases recorded")
+        return
+
+    table = df.pivot_table(
+        index="bench_name", columns="phase", values="duration", fill_value=0.0
+    )
+    table.loc["total"] = table.sum()
+    table["total"] = table.sum(axis=1)
+    print(table.round(2).to_string())
+
+    share = table.loc["total"].drop("total") / table.loc["total", "total"] * 100.0
+    print("\nShare of total time (%)")
+    print(share.sort_values(ascending=False).round(2).to_string())
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 1:
-        sys.exit("Usage: python script.py <db>")
+    if len(sys.argv) < 2:
+        sys.exit(
+            "Usage: python script.py <db> [phases | scaling | profiles [symbol|srcline]]"
+        )
     with duckdb.connect(sys.argv[1]) as conn:
-        run(conn)
+        if len(sys.argv) > 2 and sys.argv[2] == "phases":
+            phases_summary(conn)
+        elif len(sys.argv) > 2 and sys.argv[2] == "scaling":
+            scaling_summary(conn)
+        elif len(sys.argv) > 2 and sys.argv[2] == "profiles":
+            profiles_summary(conn, sys.argv[3] if len(sys.argv) > 3 else "symbol")
+        else:
+            run(conn)
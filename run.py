@@ -3,15 +3,37 @@ import pandas as pd
 import sys
 import os
 import io
+import ctypes
+import hashlib
+import itertools
+import mmap
+import shutil
+import re
+import tempfile
+import time
 import duckdb
 import yaml
 import json
 import subprocess
 import cv2
-import io
-from skimage.metrics import structural_similarity as similarity
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, List, Tuple, Optional, Any
 
+# SSIM parameters, kept identical to skimage's structural_similarity defaults
+SSIM_WIN_SIZE = 7
+SSIM_K1 = 0.01
+SSIM_K2 = 0.03
+SSIM_TILE_SIZE = 512
+
+# Default sampler for the untimed profiling iteration ($PROFILE is replaced by
+# the data file) and number of hot symbols/source lines kept per group
+PROFILE_RECORD = "perf record -F 999 -o $PROFILE --"
+PROFILE_TOP = 20
+
+# Exact value of each metric when the prediction is identical to the reference
+IDENTICAL_METRIC = {"MAPE": 0.0, "MCR": 0.0, "SSIM": 1.0}
+
 # ============================================================
 # Bookkeeping
 # ============================================================
@@ -67,6 +89,12 @@ def select_benchmark(conn, name: str, version: int) -> Optional[Tuple[str, int,
     ).fetchone()
 
 
+def select_server_threads(conn, hostname: str) -> int:
+    return conn.execute(
+        "SELECT threads FROM Server WHERE hostname = ?;", (hostname,)
+    ).fetchone()[0]
+
+
 def save_benchmarks(conn, benchmarks: List[Dict[str, Any]]):
     for bench in benchmarks:
         if select_benchmark(conn, bench["name"], bench["version"]) is None:
@@ -92,8 +120,8 @@ def save_benchmarks(conn, benchmarks: List[Dict[str, Any]]):
 def save_execution_group(conn, exec_info: Dict[str, Any]) -> int:
     return conn.execute(
         """
-        INSERT INTO ExecutionGroup(type, approx_rate, approx_type, compile_command, num_threads, server, bench_name, bench_version)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO ExecutionGroup(type, approx_rate, approx_type, compile_command, num_threads, scaling, work_scale, timed, server, bench_name, bench_version)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         RETURNING id;
         """,
         (
@@ -102,6 +130,9 @@ def save_execution_group(conn, exec_info: Dict[str, Any]) -> int:
             exec_info["approx_type"],
             exec_info["compile_command"],
             exec_info["num_threads"],
+            exec_info["scaling"],
+            exec_info.get("work_scale"),
+            exec_info.get("timed", True),
             exec_info["server"],
             exec_info["bench_name"],
             exec_info["bench_version"],
@@ -159,6 +190,41 @@ def update_exec_endtime(conn, group_id: int, exec_id: int):
     )
 
 
+def update_exec_digest(conn, group_id: int, exec_id: int, digest: str):
+    conn.execute(
+        "UPDATE Execution SET digest = ? WHERE group_id = ? AND id = ?;",
+        (digest, group_id, exec_id),
+    )
+
+
+def update_exec_input_state(conn, group_id: int, exec_id: int, state: str):
+    conn.execute(
+        "UPDATE Execution SET input_state = ? WHERE group_id = ? AND id = ?;",
+        (state, group_id, exec_id),
+    )
+
+
+def save_orchestrator_phases(
+    conn, group_id: int, exec_id: Optional[int], timings: Dict[str, float]
+):
+    conn.executemany(
+        "INSERT INTO OrchestratorPhase(group_id, exec_id, phase, duration) VALUES (?, ?, ?, ?);",
+        [(group_id, exec_id, name, value) for name, value in timings.items()],
+    )
+
+
+def save_hotspots(conn, group_id: int, kind: str, hotspots: List[Tuple[str, float]]):
+    if not hotspots:
+        return
+    conn.executemany(
+        "INSERT INTO ProfileHotspot(group_id, kind, rank, name, percent) VALUES (?, ?, ?, ?, ?);",
+        [
+            (group_id, kind, rank, name, percent)
+            for rank, (name, percent) in enumerate(hotspots)
+        ],
+    )
+
+
 def save_metric(conn, group_id: int, exec_id: int, name: str, value: float):
     conn.execute(
         "INSERT INTO QualityMetrics(group_id, exec_id, name, value) VALUES (?, ?, ?, ?);",
@@ -174,6 +240,11 @@ def save_metric(conn, group_id: int, exec_id: int, name: str, value: float):
 def load_file_type(path: str) -> np.ndarray:
     ext = os.path.splitext(path)[1].lower()
 
+    # Binary outputs are mapped read-only, so the metrics work directly on
+    # the mapped pages without parsing or copying the data.
+    if ext == ".npy":
+        return np.load(path, mmap_mode="r")
+
     df = []
     if ext == ".parquet":
         df = duckdb.read_parquet(path).df()
@@ -189,8 +260,8 @@ def load_file_type(path: str) -> np.ndarray:
 
 
 def mape(reference: str, prediction: str):
-    ref_vals = load_file_type(reference).astype(np.float64)
-    pred_vals = load_file_type(prediction).astype(np.float64)
+    ref_vals = load_file_type(reference).astype(np.float64, copy=False)
+    pred_vals = load_file_type(prediction).astype(np.float64, copy=False)
     if ref_vals.shape != pred_vals.shape:
         print(f"[ERROR] Shape mismatch: {ref_vals.shape} != {pred_vals.shape}")
         sys.exit(-1)
@@ -220,12 +291,97 @@ def mcr(reference: str, prediction: str):
     return (mismatches / total_elements) * 100.0
 
 
+def ssim_tile(
+    ref: np.ndarray, pred: np.ndarray, rows: slice, cols: slice
+) -> Tuple[float, int]:
+    """Sums the SSIM map over (rows, cols), read with a window-radius halo."""
+    pad = (SSIM_WIN_SIZE - 1) // 2
+    y0, y1 = rows.start - pad, rows.stop + pad
+    x0, x1 = cols.start - pad, cols.stop + pad
+
+    x = ref[y0:y1, x0:x1].astype(np.float64)
+    y = pred[y0:y1, x0:x1].astype(np.float64)
+
+    def box(img: np.ndarray) -> np.ndarray:
+        return cv2.boxFilter(
+            img,
+            cv2.CV_64F,
+            (SSIM_WIN_SIZE, SSIM_WIN_SIZE),
+            normalize=True,
+            borderType=cv2.BORDER_REFLECT,
+        )
+
+    np_win = SSIM_WIN_SIZE * SSIM_WIN_SIZE
+    cov_norm = np_win / (np_win - 1)
+
+    ux = box(x)
+    uy = box(y)
+    vx = cov_norm * (box(x * x) - ux * ux)
+    vy = cov_norm * (box(y * y) - uy * uy)
+    vxy = cov_norm * (box(x * y) - ux * uy)
+
+    data_range = 255.0
+    c1 = (SSIM_K1 * data_range) ** 2
+    c2 = (SSIM_K2 * data_range) ** 2
+
+    s = ((2 * ux * uy + c1) * (2 * vxy + c2)) / (
+        (ux * ux + uy * uy + c1) * (vx + vy + c2)
+    )
+    core = s[pad:-pad, pad:-pad]
+    return float(core.sum(dtype=np.float64)), core.size
+
+
+def ssim_tiled(
+    ref: np.ndarray,
+    pred: np.ndarray,
+    tile_size: int = SSIM_TILE_SIZE,
+    workers: Optional[int] = None,
+) -> float:
+    """Mean SSIM as skimage's structural_similarity, over parallel tiles."""
+    if ref.shape != pred.shape:
+        print(f"[ERROR] Shape mismatch: {ref.shape} != {pred.shape}")
+        sys.exit(-1)
+
+    # Pixels closer than the window radius to the border are ignored, as in
+    # skimage, so the tiles only cover the interior of the image.
+    pad = (SSIM_WIN_SIZE - 1) // 2
+    height, width = ref.shape
+    tiles = [
+        (
+            slice(y, min(y + tile_size, height - pad)),
+            slice(x, min(x + tile_size, width - pad)),
+        )
+        for y in range(pad, height - pad, tile_size)
+        for x in range(pad, width - pad, tile_size)
+    ]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        partials = list(pool.map(lambda t: ssim_tile(ref, pred, *t), tiles))
+
+    total = sum(p[0] for p in partials)
+    count = sum(p[1] for p in partials)
+    return total / count
+
+
 def ssim(reference: str, prediction: str):
     ref = cv2.imread(reference)
     pred = cv2.imread(prediction)
     ref_gray = cv2.cvtColor(ref, cv2.COLOR_BGR2GRAY)
     pred_gray = cv2.cvtColor(pred, cv2.COLOR_BGR2GRAY)
-    return similarity(ref_gray, pred_gray)
+    return ssim_tiled(ref_gray, pred_gray)
+
+
+def compute_metric(metric: str, reference: str, prediction: str) -> Optional[float]:
+    match metric:
+        case "MAPE":
+            return float(mape(reference, prediction))
+        case "SSIM":
+            return float(ssim(reference, prediction))
+        case "MCR":
+            return float(mcr(reference, prediction))
+        case _:
+            print(f"[ERROR] {metric} is currently not supported")
+            return None
 
 
 def metric(
@@ -235,34 +391,45 @@ def metric(
     metric: str,
     reference: str,
     prediction: str,
+    digests: Dict[str, str],
+    cache: Dict[Tuple[str, str, str], float],
 ):
-    match metric:
-        case "MAPE":
-            save_metric(
-                conn,
-                gid,
-                exec_id,
-                metric,
-                float(mape(reference, prediction)),
-            )
-        case "SSIM":
-            save_metric(conn, gid, exec_id, metric, float(ssim(reference, prediction)))
-        case "MCR":
-            save_metric(conn, gid, exec_id, metric, float(mcr(reference, prediction)))
-        case _:
-            print(f"[ERROR] {metric} is currently not supported")
+    """Saves the metric, short-circuiting equal digests and cached digest pairs."""
+    ref_digest = digests.get(os.path.normpath(reference))
+    pred_digest = digests.get(os.path.normpath(prediction))
+    key = (metric, ref_digest, pred_digest)
+
+    if ref_digest is None or pred_digest is None:
+        value = compute_metric(metric, reference, prediction)
+    elif ref_digest == pred_digest and metric in IDENTICAL_METRIC:
+        value = IDENTICAL_METRIC[metric]
+    elif key in cache:
+        value = cache[key]
+    else:
+        value = compute_metric(metric, reference, prediction)
+        if value is not None:
+            cache[key] = value
+
+    if value is not None:
+        save_metric(conn, gid, exec_id, metric, value)
 
 
 def make(cmd: str):
     subprocess.run(cmd, shell=True, executable="/bin/bash", check=True)
 
 
+def bench_command(exec_info: Dict[str, Any]) -> str:
+    binary = f"{exec_info['bench_path']}/{exec_info['bench_name']}"
+    cmd = f"{exec_info.get('binary', binary)} "
+    for _, val in exec_info["inputs"].items():
+        cmd += f"{str(val).replace('$PATH', exec_info['bench_path'])} "
+    return cmd
+
+
 def run_benchmark(conn, group_id: int, exec_id: int, exec_info: Dict[str, Any]):
     # Build command
     cmd = "/usr/bin/time -f 'elapsed,user,sys\n%e,%U,%S' perf stat -x , "
-    cmd += f"{exec_info['bench_path']}/{exec_info['bench_name']} "
-    for _, val in exec_info["inputs"].items():
-        cmd += f"{str(val).replace('$PATH', exec_info['bench_path'])} "
+    cmd += bench_command(exec_info)
 
     try:
         env = os.environ.copy()
@@ -322,12 +489,74 @@ def run_benchmark(conn, group_id: int, exec_id: int, exec_info: Dict[str, Any]):
         save_exec_error(conn, group_id, exec_id, e.returncode, e.stderr)
 
 
-def pos_process(cmd: str):
+def parse_perf_report(report: str, top: int) -> List[Tuple[str, float]]:
+    """Parses `perf report --fields overhead,<key>` lines into (name, percent)."""
+    hotspots = []
+    for line in report.splitlines():
+        match = re.match(r"^\s*([\d.]+)%\s+(?:\[[.kguH]\]\s+)?(.+?)\s*$", line)
+        if match is None:
+            continue
+        hotspots.append((match.group(2), float(match.group(1))))
+        if len(hotspots) == top:
+            break
+    return hotspots
+
+
+def profile_benchmark(
+    conn, group_id: int, exec_info: Dict[str, Any], profile: Dict[str, Any]
+):
+    """Saves the hot symbols and source lines of an untimed, profiled run."""
+    env = os.environ.copy()
+    env.update(exec_info["env_vars"])
+    top = profile.get("top", PROFILE_TOP)
+    exec_info = {**exec_info, "bench_path": os.path.abspath(exec_info["bench_path"])}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = os.path.join(tmp, "perf.data")
+        record = profile.get("record", PROFILE_RECORD).replace("$PROFILE", data)
+        try:
+            subprocess.run(
+                f"{record} {bench_command(exec_info)}",
+                shell=True,
+                executable="/bin/bash",
+                cwd=tmp,
+                capture_output=True,
+                text=True,
+                check=True,
+                env=env,
+            )
+            for kind, sort in (("symbol", "sym"), ("srcline", "srcline")):
+                report = subprocess.run(
+                    ["perf", "report", "-i", data, "--stdio", "-q", "--no-children"]
+                    + ["--fields", f"overhead,{sort}", "--sort", sort],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                hotspots = parse_perf_report(report.stdout, top)
+                if (
+                    kind == "srcline"
+                    and hotspots
+                    and not any(
+                        re.search(r"^[^?].*:\d+$", name) for name, _ in hotspots
+                    )
+                ):
+                    print(
+                        f"[WARN] No source line resolved for {exec_info['bench_name']}, "
+                        "is it built with -g?"
+                    )
+                save_hotspots(conn, group_id, kind, hotspots)
+        except subprocess.CalledProcessError as e:
+            print(f"[WARN] Profiling failed with code ({e.returncode}).\n{e.stderr}")
+
+
+def pos_process(cmd: str, cwd: Optional[str] = None):
     try:
         subprocess.run(
             cmd,
             shell=True,
             executable="/bin/bash",
+            cwd=cwd,
             capture_output=True,
             text=True,
             check=True,
@@ -339,14 +568,423 @@ def pos_process(cmd: str):
         sys.exit(-1)
 
 
+# ============================================================
+# Output store
+# ============================================================
+
+
+def file_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def store_output(path: str) -> str:
+    """Moves an output into its digest store, hard-linked back; returns the digest."""
+    digest = file_digest(path)
+    store = os.path.join(os.path.dirname(path), "store")
+    os.makedirs(store, exist_ok=True)
+
+    obj = os.path.join(store, digest + os.path.splitext(path)[1])
+    if os.path.exists(obj):
+        os.remove(path)
+    else:
+        os.replace(path, obj)
+    os.link(obj, path)
+    return digest
+
+
+# ============================================================
+# Input staging
+# ============================================================
+
+libc = ctypes.CDLL(None, use_errno=True)
+
+
+def stage_input(path: str) -> Dict[str, Any]:
+    """Maps an input and locks it in the page cache, or only pre-faults it."""
+    # A shared read-only mapping, so mlock and mincore act on the page cache of
+    # the file itself and not on a private copy of it.
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    mapping.madvise(mmap.MADV_WILLNEED)
+
+    buffer = np.frombuffer(mapping, dtype=np.uint8)
+    address = buffer.ctypes.data
+    locked = libc.mlock(ctypes.c_void_p(address), ctypes.c_size_t(len(mapping))) == 0
+
+    staged = {"path": path, "map": mapping, "buffer": buffer, "address": address}
+    if not locked:
+        print(
+            f"[WARN] Could not lock {path} in memory "
+            f"({os.strerror(ctypes.get_errno())}), pre-faulting only"
+        )
+        fault_input(staged)
+    return staged
+
+
+def fault_input(staged: Dict[str, Any]):
+    mapping = staged["map"]
+    for offset in range(0, len(mapping), mmap.PAGESIZE):
+        mapping[offset]
+
+
+def input_residency(staged: Dict[str, Any]) -> float:
+    """Fraction of the input pages currently resident in memory (mincore)."""
+    length = len(staged["map"])
+    pages = (length + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+    vec = (ctypes.c_ubyte * pages)()
+    res = libc.mincore(ctypes.c_void_p(staged["address"]), ctypes.c_size_t(length), vec)
+    if res != 0:
+        return 0.0
+    return sum(v & 1 for v in vec) / pages
+
+
+def stage_inputs(benchmarks: List[Dict[str, Any]]) -> Dict[Tuple[str, int], List]:
+    staged = {}
+    for bench in benchmarks:
+        files = []
+        for path in bench.get("staged_inputs", []):
+            path = path.replace("$PATH", bench["path"])
+            if not os.path.exists(path):
+                print(f"[WARN] Staged input {path} does not exist")
+                continue
+            if os.path.getsize(path) == 0:
+                continue
+            print(f"[INFO] Staging input {path}")
+            files.append(stage_input(path))
+        staged[(bench["name"], bench["version"])] = files
+    return staged
+
+
+def ensure_inputs_resident(staged: List[Dict[str, Any]]) -> Optional[str]:
+    """Refaults evicted inputs; returns "warm", "refaulted", "cold" or None."""
+    if not staged:
+        return None
+
+    state = "warm"
+    for entry in staged:
+        if input_residency(entry) == 1.0:
+            continue
+        fault_input(entry)
+        if input_residency(entry) < 1.0:
+            print(f"[WARN] Input {entry['path']} is not fully resident")
+            state = "cold"
+        elif state == "warm":
+            state = "refaulted"
+    return state
+
+
+# ============================================================
+# Self-profiling
+# ============================================================
+
+
+class TimedConnection:
+    """Adds the time spent in execute() and executemany() to timings["db"]."""
+
+    def __init__(self, conn, timings: Dict[str, float]):
+        self.conn = conn
+        self.timings = timings
+
+    def execute(self, *args):
+        return self.timed(self.conn.execute, *args)
+
+    def executemany(self, *args):
+        return self.timed(self.conn.executemany, *args)
+
+    def timed(self, func, *args):
+        start = time.perf_counter()
+        res = func(*args)
+        self.timings["db"] = self.timings.get("db", 0.0) + time.perf_counter() - start
+        return res
+
+
+@contextmanager
+def phase(timings: Dict[str, float], name: str):
+    """Adds the wall time of the block, minus its db time, to timings[name]."""
+    start = time.perf_counter()
+    db_start = timings.get("db", 0.0)
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        elapsed -= timings.get("db", 0.0) - db_start
+        timings[name] = timings.get(name, 0.0) + elapsed
+
+
+def flush_phases(conn, group_id: int, exec_id: Optional[int], timings):
+    if timings:
+        save_orchestrator_phases(conn, group_id, exec_id, timings)
+    timings.clear()
+
+
 # ============================================================
 # Orchestration
 # ============================================================
 
 
-def execution(conn, executions: List[Dict[str, Any]], server: str):
+def thread_ladder(max_threads: int) -> List[int]:
+    """Powers of two up to max_threads, always ending with max_threads."""
+    ladder = [1]
+    while ladder[-1] * 2 <= max_threads:
+        ladder.append(ladder[-1] * 2)
+    if ladder[-1] != max_threads:
+        ladder.append(max_threads)
+    return ladder
+
+
+def scaling_studies(entry: Dict[str, Any], max_threads: int) -> List[Dict[str, Any]]:
+    """Expands an entry into its regular, strong- and weak-scaling sweeps."""
+    threads = entry["num_threads"]
+    if threads == "auto":
+        threads = thread_ladder(max_threads)
+
+    base = {"scaling": None, "threads": threads, "inputs": entry["inputs"]}
+    studies = [{**base, "weak": {}}]
+
+    scaling = entry.get("scaling", {})
+    for name, values in scaling.get("strong", {}).items():
+        if name not in entry["inputs"]:
+            print(f"[ERROR] Strong-scaling input {name} is not an input")
+            sys.exit(-1)
+        if not isinstance(values, list) or not values:
+            print(f"[ERROR] Strong-scaling values of {name} must be a non-empty list")
+            sys.exit(-1)
+        for value in values:
+            if value == entry["inputs"][name]:
+                continue
+            inputs = {**entry["inputs"], name: value}
+            studies.append({**base, "scaling": "strong", "inputs": inputs, "weak": {}})
+
+    weak = scaling.get("weak", {})
+    for name, degree in weak.items():
+        if name not in entry["inputs"]:
+            print(f"[ERROR] Weak-scaling input {name} is not an input")
+            sys.exit(-1)
+        if not isinstance(degree, (int, float)) or degree <= 0:
+            print(f"[ERROR] Work degree of {name} must be a positive number")
+            sys.exit(-1)
+
+    if weak:
+        studies.append({**base, "scaling": "weak", "weak": weak})
+    return studies
+
+
+def study_inputs(study: Dict[str, Any], threads: int) -> Dict[str, Any]:
+    # Each of the k inputs takes an equal share of the growth: work ~ threads
+    inputs = dict(study["inputs"])
+    for name, degree in study["weak"].items():
+        exponent = 1.0 / (degree * len(study["weak"]))
+        inputs[name] = round(inputs[name] * threads**exponent)
+    return inputs
+
+
+def study_work_scale(study: Dict[str, Any], inputs: Dict[str, Any]) -> Optional[float]:
+    """Work of a weak-scaling run over its 1-thread run, from the actual inputs."""
+    if not study["weak"]:
+        return None
+    scale = 1.0
+    for name, degree in study["weak"].items():
+        scale *= (inputs[name] / study["inputs"][name]) ** degree
+    return scale
+
+
+# ============================================================
+# Quality-only execution
+# ============================================================
+
+
+def fill_template(template: str, values: Dict[str, Any]) -> str:
+    """Replaces each placeholder of values, in order, in the template."""
+    for name, value in values.items():
+        template = template.replace(name, str(value))
+    return template
+
+
+def start_quality_job(ctx: Dict[str, Any], job: Dict[str, Any]):
+    # Runs overlap, so each one times its own bookkeeping
+    job["timings"] = {}
+    job["conn"] = TimedConnection(ctx["raw_conn"], job["timings"])
+    save_execution_run(job["conn"], job["gid"], job["id"])
+    os.makedirs(job["dir"])
+
+    env = os.environ.copy()
+    env.update(job["variant"]["env_vars"])
+    job["stderr"] = open(os.path.join(job["dir"], "stderr"), "w+")
+    job["proc"] = subprocess.Popen(
+        bench_command(job["meta"]),
+        shell=True,
+        executable="/bin/bash",
+        cwd=job["dir"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=job["stderr"],
+        preexec_fn=lambda cores=job["cores"]: os.sched_setaffinity(0, cores),
+    )
+
+
+def finish_quality_job(ctx: Dict[str, Any], job: Dict[str, Any]):
+    conn, timings = job["conn"], job["timings"]
+    gid, id, variant = job["gid"], job["id"], job["variant"]
+
+    update_exec_endtime(conn, gid, id)
+    job["stderr"].seek(0)
+    stderr = job["stderr"].read()
+    job["stderr"].close()
+    if job["proc"].returncode != 0:
+        save_exec_error(conn, gid, id, job["proc"].returncode, stderr)
+        flush_phases(ctx["raw_conn"], gid, id, timings)
+        return
+
+    with phase(timings, "pos_process"):
+        pos_process(fill_template(variant["pos_processing"], job["values"]), job["dir"])
+
+    if variant.get("output") is not None:
+        output = os.path.normpath(fill_template(variant["output"], job["values"]))
+        with phase(timings, "store"):
+            ctx["digests"][output] = store_output(output)
+        update_exec_digest(conn, gid, id, ctx["digests"][output])
+
+    if variant.get("metric") is not None and job["baseline"] is not None:
+        base_gid, base_id = job["baseline"]
+        values = {"$ID_GROUP_BASE": base_gid, **job["values"], "$ID_BASE": base_id}
+        with phase(timings, "metric"):
+            metric(
+                conn,
+                gid,
+                id,
+                variant["metric"]["type"],
+                fill_template(variant["metric"]["prediction"], values),
+                fill_template(variant["metric"]["reference"], values),
+                ctx["digests"],
+                ctx["metric_cache"],
+            )
+
+    flush_phases(ctx["raw_conn"], gid, id, timings)
+
+
+def run_quality_jobs(ctx: Dict[str, Any], jobs: List[Dict[str, Any]], cores: List[int]):
+    """Runs the jobs pinned to disjoint cores, the largest first as cores free up."""
+    pending = sorted(jobs, key=lambda j: -j["meta"]["num_threads"])
+    running = []
+    free = list(cores)
+    while pending or running:
+        done = [job for job in running if job["proc"].poll() is not None]
+        for job in done:
+            running.remove(job)
+            free = sorted(free + job["cores"])
+
+        for job in list(pending):
+            need = min(job["meta"]["num_threads"], len(cores))
+            if need <= len(free):
+                job["cores"], free = free[:need], free[need:]
+                start_quality_job(ctx, job)
+                running.append(job)
+                pending.remove(job)
+
+        if not done:
+            time.sleep(0.05)
+        for job in done:
+            finish_quality_job(ctx, job)
+
+
+def quality_execution(
+    ctx: Dict[str, Any],
+    entry: Dict[str, Any],
+    bench_path: str,
+    server: str,
+    max_threads: int,
+):
+    """Runs an entry for its quality metrics only, co-scheduling untimed runs."""
+    conn, timings = ctx["conn"], ctx["timings"]
+    bench_path = os.path.abspath(bench_path)
+    cores = sorted(os.sched_getaffinity(0))
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for study in scaling_studies(entry, max_threads):
+            if study["scaling"] == "weak":
+                continue
+
+            base_jobs = []
+            jobs = []
+            for variant in entry["variants"]:
+                is_base = variant.get("baseline") is not None
+                threads = [1] if is_base else study["threads"]
+                iterations = 1 if is_base else entry["num_executions"]
+
+                for t in threads:
+                    for rate in variant.get("approx_rates", [None]):
+                        values = {
+                            "$PATH": bench_path,
+                            "$NUM_THREADS": t,
+                            "$APPROX_RATE": rate,
+                        }
+                        group_meta = {
+                            "type": variant["type"],
+                            "approx_rate": rate,
+                            "approx_type": variant.get("approx_type", None),
+                            "compile_command": variant["compile"],
+                            "num_threads": t,
+                            "scaling": study["scaling"],
+                            "timed": False,
+                            "server": server,
+                            "bench_name": entry["bench_name"],
+                            "bench_version": entry["bench_version"],
+                            "bench_path": bench_path,
+                            "inputs": study_inputs(study, t),
+                            "env_vars": variant["env_vars"],
+                        }
+
+                        with phase(timings, "compile"):
+                            make(fill_template(variant["compile"], values))
+                        gid = save_execution_group(conn, group_meta)
+                        save_exec_input(conn, gid, group_meta["inputs"])
+                        save_exec_envs(conn, gid, variant["env_vars"])
+
+                        group_dir = os.path.join(workdir, f"g{gid}")
+                        os.makedirs(group_dir)
+                        group_meta["binary"] = shutil.copy2(
+                            os.path.join(bench_path, entry["bench_name"]), group_dir
+                        )
+                        flush_phases(ctx["raw_conn"], gid, None, timings)
+
+                        for id in range(iterations):
+                            job = {
+                                "gid": gid,
+                                "id": id,
+                                "dir": os.path.join(workdir, f"g{gid}_r{id}"),
+                                "meta": group_meta,
+                                "variant": variant,
+                                "values": {**values, "$ID_RUN": id, "$ID_GROUP": gid},
+                                "baseline": None,
+                            }
+                            (base_jobs if is_base else jobs).append(job)
+
+            # The baseline output must exist before any metric is computed
+            run_quality_jobs(ctx, base_jobs, cores)
+            if base_jobs:
+                for job in jobs:
+                    job["baseline"] = (base_jobs[-1]["gid"], base_jobs[-1]["id"])
+            run_quality_jobs(ctx, jobs, cores)
+
+
+def execution(
+    conn,
+    executions: List[Dict[str, Any]],
+    server: str,
+    staged: Dict[Tuple[str, int], List],
+):
+    digests = {}
+    metric_cache = {}
+
+    # Bookkeeping goes through the timed connection, the phase rows
+    # themselves are written with the raw one.
+    timings = {}
+    raw_conn = conn
+    conn = TimedConnection(raw_conn, timings)
+    max_threads = select_server_threads(raw_conn, server)
     for entry in executions:
-        res = select_benchmark(conn, entry["bench_name"], entry["bench_version"])
+        res = select_benchmark(raw_conn, entry["bench_name"], entry["bench_version"])
         if not res:
             continue
         _, _, bench_path = res
@@ -355,11 +993,34 @@ def execution(conn, executions: List[Dict[str, Any]], server: str):
             print("[ERROR] There should be only one baseline per variant")
             sys.exit(-1)
 
+        if entry.get("quality_only") and any(
+            v.get("profile") for v in entry["variants"]
+        ):
+            print("[ERROR] Variants of a quality-only entry cannot be profiled")
+            sys.exit(-1)
+
+        if entry.get("quality_only"):
+            ctx = {
+                "conn": conn,
+                "raw_conn": raw_conn,
+                "timings": timings,
+                "digests": digests,
+                "metric_cache": metric_cache,
+            }
+            quality_execution(ctx, entry, bench_path, server, max_threads)
+            continue
+
+        # Each study runs every variant, starting again from the baseline
         baseline_gid = -1
         baseline_id = -1
-        for variant in entry["variants"]:
+        for study, variant in itertools.product(
+            scaling_studies(entry, max_threads), entry["variants"]
+        ):
             is_base = variant.get("baseline") is not None
-            threads = [1] if is_base else entry["num_threads"]
+            # Weak studies compute no metric, so they need no baseline output
+            if is_base and study["scaling"] == "weak":
+                continue
+            threads = [1] if is_base else study["threads"]
             iterations = 1 if is_base else entry["num_executions"]
 
             for t in threads:
@@ -370,68 +1031,108 @@ def execution(conn, executions: List[Dict[str, Any]], server: str):
                         "approx_type": variant.get("approx_type", None),
                         "compile_command": variant["compile"],
                         "num_threads": t,
+                        "scaling": study["scaling"],
                         "server": server,
                         "bench_name": entry["bench_name"],
                         "bench_version": entry["bench_version"],
                         "bench_path": bench_path,
-                        "inputs": entry["inputs"],
+                        "inputs": study_inputs(study, t),
                         "env_vars": variant["env_vars"],
                     }
-
-                    make(
-                        variant["compile"]
-                        .replace("$PATH", bench_path)
-                        .replace("$NUM_THREADS", str(t))
-                        .replace("$APPROX_RATE", str(rate))
+                    group_meta["work_scale"] = study_work_scale(
+                        study, group_meta["inputs"]
                     )
+                    values = {
+                        "$PATH": bench_path,
+                        "$NUM_THREADS": t,
+                        "$APPROX_RATE": rate,
+                    }
+
+                    with phase(timings, "compile"):
+                        make(fill_template(variant["compile"], values))
                     gid = save_execution_group(conn, group_meta)
                     if is_base:
                         baseline_gid = gid
 
-                    save_exec_input(conn, gid, entry["inputs"])
+                    save_exec_input(conn, gid, group_meta["inputs"])
                     save_exec_envs(conn, gid, variant["env_vars"])
+                    flush_phases(raw_conn, gid, None, timings)
 
                     for id in range(iterations):
+                        run_values = {**values, "$ID_RUN": id, "$ID_GROUP": gid}
                         save_execution_run(conn, gid, id)
-                        run_benchmark(conn, gid, id, group_meta)
+                        with phase(timings, "stage"):
+                            state = ensure_inputs_resident(
+                                staged.get(
+                                    (entry["bench_name"], entry["bench_version"])
+                                )
+                            )
+                        if state is not None:
+                            update_exec_input_state(conn, gid, id, state)
+                        with phase(timings, "run"):
+                            run_benchmark(conn, gid, id, group_meta)
                         update_exec_endtime(conn, gid, id)
 
-                        pos_process(
-                            variant["pos_processing"]
-                            .replace("$PATH", bench_path)
-                            .replace("$NUM_THREADS", str(t))
-                            .replace("$APPROX_RATE", str(rate))
-                            .replace("$ID_RUN", str(id))
-                            .replace("$ID_GROUP", str(gid))
-                        )
+                        with phase(timings, "pos_process"):
+                            pos_process(
+                                fill_template(variant["pos_processing"], run_values)
+                            )
+
+                        if variant.get("output") is not None:
+                            output = os.path.normpath(
+                                fill_template(variant["output"], run_values)
+                            )
+                            with phase(timings, "store"):
+                                digests[output] = store_output(output)
+                            update_exec_digest(conn, gid, id, digests[output])
 
                         if is_base:
                             baseline_id = id
+                            flush_phases(raw_conn, gid, id, timings)
                             continue
 
-                        if variant.get("metric") is not None:
+                        # Weak-scaling outputs do not match the baseline size
+                        if (
+                            variant.get("metric") is not None
+                            and study["scaling"] != "weak"
+                        ):
                             mtype = variant["metric"]["type"]
-                            pred = (
-                                variant["metric"]["prediction"]
-                                .replace("$PATH", bench_path)
-                                .replace("$APPROX_RATE", str(rate))
-                                .replace("$NUM_THREADS", str(t))
-                                .replace("$ID_GROUP_BASE", str(baseline_gid))
-                                .replace("$ID_RUN", str(id))
-                                .replace("$ID_GROUP", str(gid))
-                                .replace("$ID_BASE", str(baseline_id))
+                            # $ID_GROUP_BASE before $ID_GROUP, $ID_BASE last
+                            metric_values = {
+                                "$ID_GROUP_BASE": baseline_gid,
+                                **run_values,
+                                "$ID_BASE": baseline_id,
+                            }
+                            pred = fill_template(
+                                variant["metric"]["prediction"], metric_values
+                            )
+                            ref = fill_template(
+                                variant["metric"]["reference"], metric_values
                             )
-                            ref = (
-                                variant["metric"]["reference"]
-                                .replace("$PATH", bench_path)
-                                .replace("$APPROX_RATE", str(rate))
-                                .replace("$NUM_THREADS", str(t))
-                                .replace("$ID_GROUP_BASE", str(baseline_gid))
-                                .replace("$ID_RUN", str(id))
-                                .replace("$ID_GROUP", str(gid))
-                                .replace("$ID_BASE", str(baseline_id))
+                            with phase(timings, "metric"):
+                                metric(
+                                    conn,
+                                    gid,
+                                    id,
+                                    mtype,
+                                    pred,
+                                    ref,
+                                    digests,
+                                    metric_cache,
+                                )
+
+                        flush_phases(raw_conn, gid, id, timings)
+
+                    profile = variant.get("profile")
+                    if profile:
+                        with phase(timings, "profile"):
+                            profile_benchmark(
+                                conn,
+                                gid,
+                                group_meta,
+                                {} if profile is True else profile,
                             )
-                            metric(conn, gid, id, mtype, pred, ref)
+                        flush_phases(raw_conn, gid, None, timings)
 
 
 def run_plan(conn, plan_path: str):
@@ -440,7 +1141,8 @@ def run_plan(conn, plan_path: str):
     save_experiment(conn, plan)
     save_server(conn, plan["server"])
     save_benchmarks(conn, plan["benchmarks"])
-    execution(conn, plan["executions"], plan["server"]["hostname"])
+    staged = stage_inputs(plan["benchmarks"])
+    execution(conn, plan["executions"], plan["server"]["hostname"], staged)
 
 
 if __name__ == "__main__":
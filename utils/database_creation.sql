@@ -44,6 +44,9 @@ CREATE TABLE IF NOT EXISTS "ExecutionGroup" (
 
   "compile_command" VARCHAR,
   "num_threads" INTEGER NOT NULL,
+  "scaling" VARCHAR,
+  "work_scale" DOUBLE,
+  "timed" BOOLEAN NOT NULL DEFAULT true,
 
   "server" VARCHAR NOT NULL,
   "bench_name" VARCHAR NOT NULL,
@@ -62,6 +65,8 @@ CREATE TABLE IF NOT EXISTS "Execution" (
 
   "start_time" TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   "end_time" TIMESTAMP,
+  "digest" CHAR(64),
+  "input_state" VARCHAR,
 
   PRIMARY KEY ("id", "group_id"),
   FOREIGN KEY ("group_id")
@@ -125,3 +130,27 @@ CREATE TABLE IF NOT EXISTS "QualityMetrics" (
   REFERENCES "Execution" ("id", "group_id"),
 );
 
+CREATE TABLE IF NOT EXISTS "OrchestratorPhase" (
+  "group_id" BIGINT NOT NULL,
+  "exec_id" BIGINT,
+  "phase" VARCHAR NOT NULL,
+
+  "duration" DOUBLE NOT NULL,
+
+  FOREIGN KEY ("group_id")
+  REFERENCES "ExecutionGroup" ("id"),
+);
+
+CREATE TABLE IF NOT EXISTS "ProfileHotspot" (
+  "group_id" BIGINT,
+  "kind" VARCHAR,
+  "rank" INTEGER,
+
+  "name" VARCHAR NOT NULL,
+  "percent" DOUBLE NOT NULL,
+
+  PRIMARY KEY ("group_id", "kind", "rank"),
+  FOREIGN KEY ("group_id")
+  REFERENCES "ExecutionGroup" ("id"),
+);
+